@@ -2,72 +2,162 @@
 API Server for YouTube Transcript Viewer
 RESTful API endpoints for the React frontend
 """
-from flask import Flask, jsonify, request
+# gevent makes transcript downloads, vector search, and OpenAI calls yield
+# on network I/O instead of serializing all requests behind a single blocked
+# handler. The CLI patches the stdlib at process entry (see main.py); patch
+# here as well so importing this module directly still works — patch_all is
+# a no-op for anything already patched.
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    _GEVENT_AVAILABLE = True
+except ImportError:
+    _GEVENT_AVAILABLE = False
+
+from flask import Flask, Response, request
+import orjson
 from flask_cors import CORS
 from goodanalysis.vector_store import VectorStore
 from goodanalysis.transcript_downloader import download_transcript, format_transcript, get_video_id_from_url
+import functools
+import logging
 import os
-import io
 import sys
+import threading
 import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stdout, redirect_stderr
 
+class _NullWriter:
+    """Discarding sink for suppressed library output; unlike StringIO it
+    never buffers what gets thrown away."""
+
+    def write(self, _):
+        pass
+
+    def flush(self):
+        pass
+
+
+_DEVNULL = _NullWriter()
+
+
 app = Flask(__name__)
 # Enable CORS for React frontend
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+
+def ojsonify(payload, status=200):
+    """jsonify replacement built on orjson.
+
+    orjson serializes straight to bytes in native code, which matters most
+    for large transcript payloads that stdlib json scans character by
+    character for escapes.
+    """
+    return Response(orjson.dumps(payload), status=status,
+                    mimetype='application/json')
+
 # Cache the vector store instance to avoid reloading the embedding model
 _vector_store_instance = None
+_vector_store_lock = threading.Lock()
+
+# Cache of known video IDs so list/membership checks don't rescan the whole
+# collection on every request; updated in place when a transcript is added.
+_video_id_cache = None
+_video_id_cache_lock = threading.Lock()
 
 
 def get_vector_store():
     """Get initialized vector store instance (cached)."""
     global _vector_store_instance
-    if _vector_store_instance is None:
-        try:
-            # Suppress print statements during initialization for web UI
-            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-                _vector_store_instance = VectorStore()
-            print("VectorStore initialized successfully", file=sys.stderr)
-        except Exception as e:
-            error_msg = f"Failed to initialize VectorStore: {str(e)}"
-            print(f"ERROR: {error_msg}", file=sys.stderr)
-            print(traceback.format_exc(), file=sys.stderr)
-            app.logger.error(
-                f"VectorStore initialization error: {traceback.format_exc()}")
-            raise
-    return _vector_store_instance
+    # Locked so the startup warm-up thread and the first request don't race
+    # to build two instances (each loading its own embedding model).
+    with _vector_store_lock:
+        if _vector_store_instance is None:
+            try:
+                # Suppress print statements during initialization for web UI
+                with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
+                    _vector_store_instance = VectorStore()
+                print("VectorStore initialized successfully", file=sys.stderr)
+            except Exception as e:
+                error_msg = f"Failed to initialize VectorStore: {str(e)}"
+                print(f"ERROR: {error_msg}", file=sys.stderr)
+                if app.logger.isEnabledFor(logging.DEBUG):
+                    print(traceback.format_exc(), file=sys.stderr)
+                # logger.exception defers traceback formatting to the handler
+                app.logger.exception("VectorStore initialization error")
+                raise
+        return _vector_store_instance
+
+
+def get_known_video_ids():
+    """Get the set of video IDs in the store (cached after first scan)."""
+    global _video_id_cache
+    with _video_id_cache_lock:
+        if _video_id_cache is None:
+            _video_id_cache = set(get_vector_store().get_all_videos())
+        return _video_id_cache
+
+
+def _remember_video_id(video_id):
+    """Record a freshly added video ID in the cache."""
+    with _video_id_cache_lock:
+        if _video_id_cache is not None:
+            _video_id_cache.add(video_id)
+    # A miss for this ID may have been cached before the transcript existed
+    _cached_transcript.cache_clear()
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_transcript(video_id):
+    """Get a transcript, caching reassembled text to skip the Chroma round-trip."""
+    return get_vector_store().get_transcript(video_id)
 
 
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({"status": "ok", "message": "API server is running"}), 200
+    return ojsonify({"status": "ok", "message": "API server is running"}), 200
 
 
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
     """Get list of all videos."""
     try:
-        vector_store = get_vector_store()
-        videos = vector_store.get_all_videos()
+        video_data = sorted(get_vector_store().get_all_video_entries(),
+                            key=lambda entry: entry['id'])
 
-        video_data = []
-        for video_id in videos:
-            video_data.append({
-                'id': video_id,
-                'url': f'https://www.youtube.com/watch?v={video_id}',
-                'thumbnail': f'https://img.youtube.com/vi/{video_id}/mqdefault.jpg'
-            })
-
-        return jsonify({
+        return ojsonify({
             'success': True,
             'videos': video_data,
             'count': len(video_data)
         }), 200
     except Exception as e:
-        app.logger.error(f"Error getting videos: {traceback.format_exc()}")
-        return jsonify({
+        app.logger.exception("Error getting videos")
+        return ojsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/videos/stream', methods=['GET'])
+def stream_videos():
+    """Stream the video list as NDJSON, one video per line."""
+    try:
+        entries = sorted(get_vector_store().get_all_video_entries(),
+                         key=lambda entry: entry['id'])
+
+        def generate():
+            # Yield each video as its own line instead of materializing the
+            # whole response; clients can render incrementally.
+            for entry in entries:
+                yield orjson.dumps(entry) + b'\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+    except Exception as e:
+        app.logger.exception("Error streaming videos")
+        return ojsonify({
             'success': False,
             'error': str(e)
         }), 500
@@ -79,14 +169,14 @@ def add_video():
     try:
         data = request.get_json()
         if not data or 'video_url' not in data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'error': 'video_url is required'
             }), 400
 
         video_url = data['video_url'].strip()
         if not video_url:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'error': 'video_url cannot be empty'
             }), 400
@@ -96,10 +186,9 @@ def add_video():
 
         # Check if video already exists
         vector_store = get_vector_store()
-        existing_videos = vector_store.get_all_videos()
 
-        if video_id in existing_videos:
-            return jsonify({
+        if video_id in get_known_video_ids():
+            return ojsonify({
                 'success': True,
                 'message': f'Video {video_id} already exists',
                 'video_id': video_id,
@@ -107,11 +196,11 @@ def add_video():
             }), 200
 
         # Download transcript
-        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
             transcript = download_transcript(video_id)
 
         if not transcript:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'error': f'Failed to download transcript for video {video_id}. Make sure the video has captions enabled.'
             }), 400
@@ -120,10 +209,11 @@ def add_video():
         transcript_text = format_transcript(transcript)
 
         # Add to vector store
-        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
             vector_store.add_transcript(video_id, transcript_text)
+        _remember_video_id(video_id)
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': f'Successfully downloaded and stored transcript for video {video_id}',
             'video_id': video_id,
@@ -131,8 +221,86 @@ def add_video():
         }), 201
 
     except Exception as e:
-        app.logger.error(f"Error adding video: {traceback.format_exc()}")
-        return jsonify({
+        app.logger.exception("Error adding video")
+        return ojsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/videos/batch', methods=['POST'])
+def add_videos_batch():
+    """Add multiple video transcripts in one pipelined request."""
+    try:
+        data = request.get_json()
+        if not data or 'video_urls' not in data:
+            return ojsonify({
+                'success': False,
+                'error': 'video_urls is required'
+            }), 400
+
+        video_urls = [url.strip() for url in data['video_urls'] if url.strip()]
+        if not video_urls:
+            return ojsonify({
+                'success': False,
+                'error': 'video_urls cannot be empty'
+            }), 400
+
+        vector_store = get_vector_store()
+        known_ids = get_known_video_ids()
+
+        # De-duplicate while preserving order, skipping videos already stored
+        results = []
+        to_download = []
+        seen = set()
+        for video_url in video_urls:
+            video_id = get_video_id_from_url(video_url)
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+            if video_id in known_ids:
+                results.append({'video_id': video_id, 'exists': True})
+            else:
+                to_download.append(video_id)
+
+        # Download transcripts in parallel (network-bound), then embed every
+        # chunk of every video in one batched encode
+        transcripts = []
+        if to_download:
+            with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    downloads = executor.map(download_transcript, to_download)
+                    for video_id, transcript in zip(to_download, downloads):
+                        if transcript:
+                            transcripts.append(
+                                (video_id, format_transcript(transcript)))
+                        else:
+                            results.append({
+                                'video_id': video_id,
+                                'success': False,
+                                'error': 'Failed to download transcript'
+                            })
+
+                if transcripts:
+                    vector_store.add_transcripts_batch(transcripts)
+
+            for video_id, transcript_text in transcripts:
+                _remember_video_id(video_id)
+                results.append({
+                    'video_id': video_id,
+                    'success': True,
+                    'char_count': len(transcript_text)
+                })
+
+        return ojsonify({
+            'success': True,
+            'results': results,
+            'added': len(transcripts)
+        }), 201 if transcripts else 200
+
+    except Exception as e:
+        app.logger.exception("Error adding videos batch")
+        return ojsonify({
             'success': False,
             'error': str(e)
         }), 500
@@ -142,16 +310,22 @@ def add_video():
 def get_video(video_id):
     """Get transcript for a specific video."""
     try:
-        vector_store = get_vector_store()
-        transcript = vector_store.get_transcript(video_id)
+        transcript = _cached_transcript(video_id)
 
         if not transcript:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'error': f'No transcript found for video: {video_id}'
             }), 404
 
-        return jsonify({
+        # Weak ETag so browsers re-rendering the same transcript get a 304
+        # without the server re-serializing a potentially large JSON body.
+        # Adler-32 is cheap and sufficient for cache validation.
+        etag = f'W/"{len(transcript)}-{zlib.adler32(transcript.encode("utf-8")):08x}"'
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304
+
+        response = ojsonify({
             'success': True,
             'video': {
                 'id': video_id,
@@ -160,11 +334,14 @@ def get_video(video_id):
                 'transcript': transcript,
                 'char_count': len(transcript)
             }
-        }), 200
+        })
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'private, max-age=60'
+        return response, 200
 
     except Exception as e:
-        app.logger.error(f"Error getting video: {traceback.format_exc()}")
-        return jsonify({
+        app.logger.exception("Error getting video")
+        return ojsonify({
             'success': False,
             'error': str(e)
         }), 500
@@ -174,7 +351,7 @@ def get_video(video_id):
 def delete_video(video_id):
     """Delete a video transcript."""
     # Note: This would require implementing delete functionality in VectorStore
-    return jsonify({
+    return ojsonify({
         'success': False,
         'error': 'Delete functionality not yet implemented'
     }), 501
@@ -182,7 +359,6 @@ def delete_video(video_id):
 
 def run_api_server(host='127.0.0.1', port=5000, debug=False):
     """Run the API server."""
-    import logging
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -196,8 +372,25 @@ def run_api_server(host='127.0.0.1', port=5000, debug=False):
     if debug:
         print("🐛 Debug mode enabled\n")
 
+    # Warm the vector store (and its ~3s embedding-model load) in the
+    # background while the server binds, so the first request doesn't pay
+    # the cold start.
+    threading.Thread(target=get_vector_store, daemon=True).start()
+
     try:
-        app.run(host=host, port=port, debug=debug)
+        if debug or not _GEVENT_AVAILABLE:
+            # Flask dev server: reloader/debugger in debug mode, and the
+            # fallback when gevent isn't installed.
+            if not _GEVENT_AVAILABLE and not debug:
+                print(
+                    "⚠️  gevent not available, using single-threaded dev server. Install with: uv sync")
+            app.run(host=host, port=port, debug=debug)
+        else:
+            # gevent WSGI server: I/O-bound endpoints (YouTube downloads,
+            # OpenAI calls) overlap instead of running one at a time.
+            from gevent.pywsgi import WSGIServer
+            print("⚡ Serving with gevent (concurrent request handling)\n")
+            WSGIServer((host, port), app).serve_forever()
     except Exception as e:
         print(f"ERROR starting server: {e}", file=sys.stderr)
         print(traceback.format_exc(), file=sys.stderr)
@@ -2,8 +2,20 @@
 """
 Main application for YouTube Transcript RAG System
 """
-import argparse
 import sys
+
+# Monkey-patch at process entry, before the imports below pull in Flask,
+# requests, torch, and chromadb — gevent can't safely patch ssl/socket/
+# threading once they're already in use. Only the API server runs under
+# gevent, so other commands stay unpatched.
+if 'api' in sys.argv[1:]:
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        pass
+
+import argparse
 from typing import Optional
 from goodanalysis.transcript_downloader import download_transcript, format_transcript, get_video_id_from_url
 from goodanalysis.vector_store import VectorStore
@@ -83,10 +95,15 @@ def view_transcript(vector_store: VectorStore, video_id: str, save_to_file: Opti
 
     if save_to_file:
         try:
-            with open(save_to_file, 'w', encoding='utf-8') as f:
-                f.write(f"Transcript for video: {video_id}\n")
-                f.write("=" * 60 + "\n\n")
-                f.write(transcript)
+            # Write pre-encoded bytes in one buffered call; skips the
+            # TextIOWrapper's incremental encoder on long transcripts.
+            payload = (
+                f"Transcript for video: {video_id}\n"
+                f"{'=' * 60}\n\n"
+                f"{transcript}"
+            ).encode('utf-8')
+            with open(save_to_file, 'wb', buffering=1 << 20) as f:
+                f.write(payload)
             print(f"\n💾 Transcript saved to: {save_to_file}")
         except Exception as e:
             print(f"\n❌ Error saving transcript to file: {e}")
@@ -4,7 +4,75 @@ Combines vector search with context for answering questions
 """
 from goodanalysis.vector_store import VectorStore
 from typing import List, Dict, Optional
+import asyncio
+import concurrent.futures
 import os
+import queue
+import threading
+
+
+class _CompletionBatcher:
+    """
+    Coalesces concurrent chat-completion calls into batched async requests.
+
+    Callers submit request kwargs and block on a future; a background thread
+    drains the queue on a short tumbling window and dispatches the whole batch
+    with asyncio.gather, so N concurrent queries share one event-loop tick and
+    one pooled HTTP connection instead of N serialized round trips.
+    """
+
+    def __init__(self, client, window_ms: int = 10, max_batch: int = 16):
+        self.client = client
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def submit(self, **create_kwargs) -> str:
+        """Enqueue one completion request and block until its response."""
+        future = concurrent.futures.Future()
+        self._queue.put((create_kwargs, future))
+        return future.result()
+
+    def _drain(self):
+        while True:
+            # Block for the first request, then collect whatever else arrives
+            # within the window (up to max_batch) into one dispatch.
+            batch = [self._queue.get()]
+            deadline = self._loop.time() + self.window_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            asyncio.run_coroutine_threadsafe(
+                self._dispatch(batch), self._loop)
+
+    async def _dispatch(self, batch):
+        try:
+            responses = await asyncio.gather(
+                *[self.client.chat.completions.create(**kwargs)
+                  for kwargs, _ in batch],
+                return_exceptions=True
+            )
+            for (_, future), response in zip(batch, responses):
+                if isinstance(response, Exception):
+                    future.set_exception(response)
+                else:
+                    future.set_result(response.choices[0].message.content)
+        except Exception as e:
+            # Callers block on future.result() with no timeout, so anything
+            # unexpected here (e.g. a response with an empty choices list)
+            # must fail the unresolved futures rather than vanish as an
+            # unretrieved task exception and hang the whole batch.
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
 
 
 class RAGSystem:
@@ -29,35 +97,45 @@ class RAGSystem:
             if self.llm_provider == "openai":
                 self.model_name = "gpt-4o-mini"  # Fast and cost-effective
 
-        # Initialize OpenAI client (only for answer generation, not embeddings)
+        # Defer the openai import and client construction to first use:
+        # the package is heavy (pulls httpx, pydantic) and retrieval-only
+        # callers like get_summary never need it.
         self.llm_client = None
+        self._batcher = None
+        self._api_key = None
         if self.llm_provider == "openai":
-            try:
-                from openai import OpenAI
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    print(
-                        "⚠️  OPENAI_API_KEY not set. Set it as an environment variable.")
-                    print(
-                        "   You can set it with: export OPENAI_API_KEY='your-key-here'")
-                    self.llm_provider = "none"
-                else:
-                    self.llm_client = OpenAI(api_key=api_key)
-            except ImportError:
-                print("⚠️  OpenAI not available. Install with: uv sync")
+            self._api_key = os.getenv("OPENAI_API_KEY")
+            if not self._api_key:
+                print(
+                    "⚠️  OPENAI_API_KEY not set. Set it as an environment variable.")
+                print(
+                    "   You can set it with: export OPENAI_API_KEY='your-key-here'")
                 self.llm_provider = "none"
         elif self.llm_provider not in ["openai", "none"]:
             print(
                 f"⚠️  Unsupported LLM provider: {self.llm_provider}. Using 'none'.")
             self.llm_provider = "none"
 
-        if self.llm_provider != "none" and self.llm_client:
+        if self.llm_provider != "none":
             print(
                 f"✅ Using {self.llm_provider.upper()} with model: {self.model_name}")
         else:
             print(
                 "⚠️  No LLM configured. Using simple retrieval mode (no answer generation).")
 
+    def _get_batcher(self) -> Optional[_CompletionBatcher]:
+        """Lazily import openai and build the client + batcher on first use."""
+        if self._batcher is None:
+            try:
+                from openai import AsyncOpenAI
+            except ImportError:
+                print("⚠️  OpenAI not available. Install with: uv sync")
+                self.llm_provider = "none"
+                return None
+            self.llm_client = AsyncOpenAI(api_key=self._api_key)
+            self._batcher = _CompletionBatcher(self.llm_client)
+        return self._batcher
+
     def query(self, question: str, n_context_chunks: int = 3) -> Dict:
         """
         Answer a question using RAG.
@@ -80,14 +158,23 @@ class RAGSystem:
                 'sources': []
             }
 
-        # Build context string
-        context_text = "\n\n".join([
-            f"[Video: {chunk['video_id']}, Chunk {chunk['chunk_index']}]\n{chunk['text']}"
-            for chunk in context_chunks
-        ])
+        # Build context string in a single pass: append the existing pieces
+        # to one buffer and join once, instead of formatting a new f-string
+        # per chunk and joining those copies again
+        parts = []
+        append = parts.append
+        for chunk in context_chunks:
+            append('[Video: ')
+            append(chunk['video_id'])
+            append(', Chunk ')
+            append(str(chunk['chunk_index']))
+            append(']\n')
+            append(chunk['text'])
+            append('\n\n')
+        context_text = ''.join(parts).rstrip('\n')
 
         # Generate answer using LLM if available
-        if self.llm_provider != "none" and self.llm_client:
+        if self.llm_provider != "none":
             answer = self._generate_answer_with_llm(question, context_text)
         else:
             # Fallback: return most relevant chunk
@@ -114,27 +201,29 @@ class RAGSystem:
         Returns:
             Generated answer
         """
-        prompt = f"""Based on the following transcript excerpts from YouTube videos, please answer the question.
+        # Keep the stable content (instructions + retrieved context) first, in
+        # the system message, and only the question in the user message.
+        # OpenAI's automatic prompt caching matches on identical prefixes, so
+        # repeated questions over the same retrieved chunks hit the cache.
+        system_prompt = f"""You are a helpful assistant that answers questions based on provided transcript excerpts from YouTube videos. Provide clear, concise answers based only on the information in the transcripts. If the transcripts don't contain enough information to answer the question, say so.
 
 Context from transcripts:
-{context}
-
-Question: {question}
-
-Please provide a clear, concise answer based only on the information provided in the transcripts. If the transcripts don't contain enough information to answer the question, say so."""
+{context}"""
 
         try:
+            batcher = self._get_batcher()
+            if batcher is None:
+                return f"Based on the transcripts, here's the relevant context:\n\n{context[:500]}..."
             if self.llm_provider == "openai":
-                response = self.llm_client.chat.completions.create(
+                return batcher.submit(
                     model=self.model_name,
                     messages=[
-                        {"role": "system", "content": "You are a helpful assistant that answers questions based on provided transcript excerpts from YouTube videos. Provide clear, concise answers based only on the information in the transcripts."},
-                        {"role": "user", "content": prompt}
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": question}
                     ],
                     temperature=0.7,
                     max_tokens=1000
                 )
-                return response.choices[0].message.content
         except Exception as e:
             print(f"⚠️  Error generating answer with LLM: {e}")
             return f"Error generating answer. Here's the relevant context:\n\n{context[:500]}..."
@@ -149,22 +238,18 @@ Please provide a clear, concise answer based only on the information provided in
         Returns:
             Summary text
         """
-        # Search for all chunks from this video
-        all_data = self.vector_store.collection.get()
-        video_chunks = []
-
-        if all_data['metadatas']:
-            for i, metadata in enumerate(all_data['metadatas']):
-                if metadata['video_id'] == video_id:
-                    video_chunks.append({
-                        'text': all_data['documents'][i],
-                        'chunk_index': metadata['chunk_index']
-                    })
-
-        # Sort by chunk index
-        video_chunks.sort(key=lambda x: x['chunk_index'])
-
-        # Combine all chunks
-        full_text = " ".join([chunk['text'] for chunk in video_chunks])
+        # Let Chroma filter by video_id instead of fetching every document
+        # and filtering in Python
+        video_data = self.vector_store.collection.get(
+            where={"video_id": video_id},
+            include=["documents", "metadatas"]
+        )
+
+        # Sort chunks by index and combine
+        ordered = sorted(
+            zip(video_data['metadatas'], video_data['documents']),
+            key=lambda pair: pair[0]['chunk_index']
+        )
+        full_text = " ".join([document for _, document in ordered])
 
         return full_text
@@ -7,8 +7,66 @@ try:
 except ImportError:
     raise ImportError("youtube-transcript-api is not installed. Run: uv sync")
 
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared session with connection pooling: batch adds reuse one keep-alive
+# connection to youtube.com instead of paying a TCP + TLS handshake per video.
+_YT_SESSION = requests.Session()
+_YT_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10, pool_maxsize=10))
+
+import re
+from operator import itemgetter
 from typing import Optional, List, Dict
 
+_entry_text = itemgetter('text')
+
+# Matches both youtube.com/watch?v= and youtu.be/ URLs, capturing the
+# 11-character video ID. Compiled once; this runs on every video add.
+_YT_ID_RE = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/)([A-Za-z0-9_-]{11})')
+
+
+def _resolve_fetcher():
+    """
+    Detect once, at import time, which youtube-transcript-api flavor is
+    installed: the new instance-based fetch() or the old static
+    get_transcript(). Returns a single fetch function so download calls
+    don't re-discover the API via raised-and-caught AttributeErrors.
+    """
+    if hasattr(YouTubeTranscriptApi, 'fetch'):
+        # Probe once whether this version accepts an injected HTTP client;
+        # if so, every fetch reuses the pooled session.
+        try:
+            YouTubeTranscriptApi(http_client=_YT_SESSION)
+            api_kwargs = {'http_client': _YT_SESSION}
+        except TypeError:
+            api_kwargs = {}
+
+        def _fetch(video_id, languages=None, translate=False):
+            kwargs = {}
+            if languages is not None:
+                kwargs['languages'] = languages
+            if translate:
+                kwargs['translate'] = True
+            return YouTubeTranscriptApi(**api_kwargs).fetch(video_id, **kwargs).to_raw_data()
+    elif hasattr(YouTubeTranscriptApi, 'get_transcript'):
+        def _fetch(video_id, languages=None, translate=False):
+            kwargs = {}
+            if languages is not None:
+                kwargs['languages'] = languages
+            if translate:
+                kwargs['translate'] = True
+            return YouTubeTranscriptApi.get_transcript(video_id, **kwargs)
+    else:
+        raise ImportError(
+            "youtube-transcript-api exposes neither fetch() nor get_transcript()")
+    return _fetch
+
+
+_fetch = _resolve_fetcher()
+
 
 def download_transcript(video_id: str, languages: List[str] = ['en'], use_auto_generated: bool = True) -> Optional[List[Dict]]:
     """
@@ -25,63 +83,32 @@ def download_transcript(video_id: str, languages: List[str] = ['en'], use_auto_g
         None if transcript not available
     """
     try:
-        # Try new API first (instance-based with fetch method)
-        try:
-            yt_api = YouTubeTranscriptApi()
-            transcript_data = yt_api.fetch(video_id, languages=languages)
-            return transcript_data.to_raw_data()
-        except (AttributeError, TypeError):
-            # Fall back to old static method API (if it exists)
-            if hasattr(YouTubeTranscriptApi, 'get_transcript'):
-                return YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
-            else:
-                raise AttributeError(
-                    "Neither fetch() nor get_transcript() methods are available")
+        return _fetch(video_id, languages=languages)
     except Exception as e:
         error_msg = str(e)
-        # If manual transcripts fail and auto-generated is enabled, try fallback strategies
-        if use_auto_generated:
-            # Strategy 1: Try without language restriction (may get auto-generated)
-            try:
-                try:
-                    yt_api = YouTubeTranscriptApi()
-                    transcript_data = yt_api.fetch(video_id)
-                    print(f"⚠️  Using available captions (may be auto-generated)")
-                    return transcript_data.to_raw_data()
-                except (AttributeError, TypeError):
-                    if hasattr(YouTubeTranscriptApi, 'get_transcript'):
-                        transcript = YouTubeTranscriptApi.get_transcript(
-                            video_id)
-                        print(f"⚠️  Using available captions (may be auto-generated)")
-                        return transcript
-                    else:
-                        raise
-            except Exception as e2:
-                # Strategy 2: Try with translate parameter (sometimes helps with auto-generated)
-                try:
-                    try:
-                        yt_api = YouTubeTranscriptApi()
-                        transcript_data = yt_api.fetch(
-                            video_id, languages=languages, translate=True)
-                        print(f"⚠️  Using translated/auto-generated captions")
-                        return transcript_data.to_raw_data()
-                    except (AttributeError, TypeError):
-                        if hasattr(YouTubeTranscriptApi, 'get_transcript'):
-                            transcript = YouTubeTranscriptApi.get_transcript(
-                                video_id, languages=languages, translate=True)
-                            print(f"⚠️  Using translated/auto-generated captions")
-                            return transcript
-                        else:
-                            raise
-                except Exception as final_error:
-                    print(
-                        f"Error downloading transcript (including auto-generated): {final_error}")
-                    print(f"Original error: {error_msg}")
-                    return None
-        else:
+        if not use_auto_generated:
             print(f"Error downloading transcript: {error_msg}")
             return None
 
+        # Strategy 1: Try without language restriction (may get auto-generated)
+        try:
+            transcript = _fetch(video_id)
+            print(f"⚠️  Using available captions (may be auto-generated)")
+            return transcript
+        except Exception:
+            pass
+
+        # Strategy 2: Try with translate parameter (sometimes helps with auto-generated)
+        try:
+            transcript = _fetch(video_id, languages=languages, translate=True)
+            print(f"⚠️  Using translated/auto-generated captions")
+            return transcript
+        except Exception as final_error:
+            print(
+                f"Error downloading transcript (including auto-generated): {final_error}")
+            print(f"Original error: {error_msg}")
+            return None
+
 
 def format_transcript(transcript: List[Dict]) -> str:
     """
@@ -93,7 +120,9 @@ def format_transcript(transcript: List[Dict]) -> str:
     Returns:
         Formatted text string
     """
-    return " ".join([entry['text'] for entry in transcript])
+    # map + itemgetter keep the extraction loop in C rather than dispatching
+    # entry['text'] bytecode per entry (hour-long videos have ~2000 entries)
+    return " ".join(map(_entry_text, transcript))
 
 
 def get_video_id_from_url(url: str) -> str:
@@ -105,10 +134,8 @@ def get_video_id_from_url(url: str) -> str:
     - https://youtu.be/VIDEO_ID
     - VIDEO_ID (if already just the ID)
     """
-    if 'youtube.com/watch?v=' in url:
-        return url.split('watch?v=')[1].split('&')[0]
-    elif 'youtu.be/' in url:
-        return url.split('youtu.be/')[1].split('?')[0]
-    else:
-        # Assume it's already a video ID
-        return url
+    match = _YT_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    # Assume it's already a video ID
+    return url
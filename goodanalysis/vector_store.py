@@ -3,10 +3,167 @@ Vector Database Integration
 Stores and retrieves transcripts using ChromaDB
 """
 import chromadb
+import numpy as np
+import torch
 from chromadb.config import Settings
+
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+except ImportError:
+    RecursiveCharacterTextSplitter = None
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Optional
+import concurrent.futures
+import importlib.util
 import os
+import queue
+import threading
+import time
+
+
+def quantize_embeddings_int8(embeddings: np.ndarray):
+    """
+    Symmetric per-vector int8 scalar quantization.
+
+    Cuts embedding storage 4x versus fp32 with negligible recall loss at
+    MiniLM scale; memory-bound scans over the quantized matrix run
+    correspondingly faster.
+
+    Args:
+        embeddings: (N, dim) float array
+
+    Returns:
+        Tuple of (int8 array of the same shape, (N, 1) float32 scales)
+    """
+    scales = np.abs(embeddings).max(axis=1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(embeddings / scales).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize_embeddings_int8(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Recover approximate float32 embeddings from int8 + per-vector scales."""
+    return quantized.astype(np.float32) * scales
+
+
+class _QueryBatcher:
+    """
+    Coalesces concurrent search() calls into one encode + one Chroma query.
+
+    Callers enqueue their query and block on a future; a background thread
+    drains the queue on a short window (up to max_batch queries) and runs a
+    single batched encode and a single multi-vector collection.query, then
+    hands each caller its own rows. Under concurrent load the encoder's
+    fixed per-call cost is amortized across the batch; a lone caller only
+    pays the window's few milliseconds.
+    """
+
+    def __init__(self, store: "VectorStore", window_ms: int = 5, max_batch: int = 32):
+        self._store = store
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def submit(self, query: str, n_results: int) -> List[Dict]:
+        """Enqueue one search and block until its results."""
+        future = concurrent.futures.Future()
+        self._queue.put((query, n_results, future))
+        return future.result()
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _dispatch(self, batch):
+        embeddings = self._store.embedding_model.encode(
+            [query for query, _, _ in batch],
+            batch_size=self.max_batch,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        # One Chroma call for the whole batch; over-fetch to the largest
+        # n_results and trim per caller
+        results = self._store.collection.query(
+            query_embeddings=embeddings,
+            n_results=max(n for _, n, _ in batch)
+        )
+        for row, (_, n_results, future) in enumerate(batch):
+            future.set_result(
+                self._store._format_results(results, row, n_results))
+
+
+def _load_embedding_model() -> SentenceTransformer:
+    """
+    Load the local embedding model with the best backend for the host.
+
+    GPU hosts load fp16 torch weights. CPU hosts (the common deployment)
+    prefer the ONNX Runtime backend, which is substantially faster for
+    MiniLM's matmul-heavy forward pass; if onnxruntime isn't installed the
+    plain PyTorch model is used instead. The checkpoint stays
+    all-MiniLM-L6-v2 in every case so stored embeddings remain compatible.
+
+    When accelerate is installed, torch paths load with low_cpu_mem_usage
+    so the safetensors weights are memory-mapped: with a preloaded master
+    process (gunicorn preload_app=True), forked workers share the read-only
+    weight pages instead of each holding a private ~90 MB copy.
+    """
+    # transformers rejects low_cpu_mem_usage outright when accelerate is
+    # missing, so only request memory-mapped loading when it can be honored
+    torch_kwargs = {}
+    if importlib.util.find_spec("accelerate") is not None:
+        torch_kwargs["low_cpu_mem_usage"] = True
+
+    if torch.cuda.is_available():
+        # fp16 weights on GPU halve memory bandwidth for the encode path;
+        # CPU keeps fp32, where half precision is slower, not faster
+        return SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            device='cuda',
+            model_kwargs={"torch_dtype": torch.float16, **torch_kwargs}
+        )
+    try:
+        return SentenceTransformer('all-MiniLM-L6-v2', backend='onnx')
+    except Exception as e:
+        print(f"⚠️  ONNX backend unavailable ({e}). Using PyTorch backend.")
+        return SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            model_kwargs=torch_kwargs
+        )
+
+
+# Process-wide model singleton: every VectorStore in this process shares one
+# loaded model instead of paying the tokenizer parse + weight load per
+# instance
+_EMBED_MODEL: Optional[SentenceTransformer] = None
+_EMBED_MODEL_LOCK = threading.Lock()
+
+
+def _get_embedding_model() -> SentenceTransformer:
+    """Get the shared embedding model, loading it on first use."""
+    global _EMBED_MODEL
+    with _EMBED_MODEL_LOCK:
+        if _EMBED_MODEL is None:
+            print("Loading local embedding model...")
+            _EMBED_MODEL = _load_embedding_model()
+            print("✅ Local embedding model loaded! (no API calls for embeddings)")
+        return _EMBED_MODEL
 
 
 class VectorStore:
@@ -14,29 +171,105 @@ class VectorStore:
         """
         Initialize vector store with ChromaDB.
 
+        Set CHROMA_SERVER_HOST (and optionally CHROMA_SERVER_PORT) to talk
+        to a standalone Chroma server instead of the embedded per-process
+        store. Multi-worker deployments (e.g. gunicorn) should prefer the
+        server: one shared HNSW index and cache instead of N workers
+        contending on the same SQLite file.
+
         Args:
             collection_name: Name of the collection to store transcripts
             persist_directory: Directory to persist the database
+                (embedded mode only)
         """
         # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False)
-        )
-
-        # Get or create collection
+        chroma_host = os.getenv("CHROMA_SERVER_HOST")
+        if chroma_host:
+            self.client = chromadb.HttpClient(
+                host=chroma_host,
+                port=int(os.getenv("CHROMA_SERVER_PORT", "8000")),
+                settings=Settings(anonymized_telemetry=False)
+            )
+        else:
+            self.client = chromadb.PersistentClient(
+                path=persist_directory,
+                settings=Settings(anonymized_telemetry=False)
+            )
+
+        # Get or create collection. Every embedding we store or query is
+        # already unit-normalized, so inner product gives the same ranking
+        # as cosine without HNSW re-normalizing at each visited node.
+        # Collections created before this change keep their cosine space
+        # (get_or_create ignores metadata for existing collections), which
+        # stays correct for normalized vectors.
+        # M=16 with ef_construction=200 and ef_search=64 is a solid
+        # recall/latency point for stores of thousands of chunks, instead
+        # of whatever the Chroma defaults happen to be.
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata={
+                "hnsw:space": "ip",
+                "hnsw:M": 16,
+                "hnsw:construction_ef": 200,
+                "hnsw:search_ef": 64
+            }
         )
 
-        # Initialize local embedding model (runs locally, no API calls)
-        # This is separate from the LLM used for answer generation
-        print("Loading local embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✅ Local embedding model loaded! (no API calls for embeddings)")
+        # Local embedding model, shared process-wide (runs locally, no API
+        # calls). This is separate from the LLM used for answer generation.
+        self.embedding_model = _get_embedding_model()
+
+        # Text splitters cached per (chunk_size, chunk_overlap) so repeated
+        # ingests don't re-instantiate them
+        self._splitters: Dict[tuple, RecursiveCharacterTextSplitter] = {}
+
+        # Distinct video IDs, hydrated from Chroma once on first use and
+        # maintained on insert so get_all_videos doesn't rescan the
+        # collection's metadata per call
+        self._video_ids: Optional[set] = None
+        self._video_ids_lock = threading.Lock()
+
+        # Query batcher, started lazily on first search so CLI commands
+        # that never query don't spawn its thread
+        self._query_batcher: Optional[_QueryBatcher] = None
+        self._query_batcher_lock = threading.Lock()
+
+        # Display-ready entries per video, formatted once instead of per
+        # list render
+        self._video_entries: Dict[str, Dict] = {}
+
+    def _known_video_ids(self) -> set:
+        """Get the cached set of video IDs, scanning Chroma only once."""
+        with self._video_ids_lock:
+            if self._video_ids is None:
+                all_data = self.collection.get(include=["metadatas"])
+                self._video_ids = {
+                    metadata['video_id']
+                    for metadata in (all_data['metadatas'] or [])
+                }
+            return self._video_ids
+
+    def _encode_chunks(self, chunks: List[str], batch_size: int) -> np.ndarray:
+        """
+        Encode chunks in length order, then restore the original order.
 
-    def add_transcript(self, video_id: str, transcript_text: str, chunk_size: int = 500, chunk_overlap: int = 50):
+        The encoder pads each batch to its longest member; feeding chunks
+        sorted by length groups similar sizes together so padding tokens
+        (pure wasted FLOPs) drop to near the batch minimum.
+        """
+        order = np.argsort([len(chunk) for chunk in chunks], kind='stable')
+        embeddings = self.embedding_model.encode(
+            [chunks[i] for i in order],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        restored = np.empty_like(embeddings)
+        restored[order] = embeddings
+        return restored
+
+    def add_transcript(self, video_id: str, transcript_text: str, chunk_size: int = 1000, chunk_overlap: int = 100):
         """
         Add transcript to vector store, chunking it for better retrieval.
 
@@ -48,9 +281,24 @@ class VectorStore:
         """
         # Split transcript into chunks
         chunks = self._chunk_text(transcript_text, chunk_size, chunk_overlap)
+        self.add_transcript_chunks(video_id, chunks)
+
+    def add_transcript_chunks(self, video_id: str, chunks: List[str], batch_size: int = 64):
+        """
+        Embed pre-chunked transcript text and store it.
+
+        All chunks go through one batched encode() call so the embedding
+        model amortizes its forward pass across the batch dimension instead
+        of running chunk-by-chunk.
 
-        # Generate embeddings
-        embeddings = self.embedding_model.encode(chunks).tolist()
+        Args:
+            video_id: YouTube video ID
+            chunks: Transcript text chunks
+            batch_size: Embedding batch size passed to the model
+        """
+        # Generate embeddings in one batched, length-bucketed call; the
+        # ndarray goes straight into Chroma without boxing into PyFloats
+        embeddings = self._encode_chunks(chunks, batch_size)
 
         # Create IDs and metadata
         ids = [f"{video_id}_chunk_{i}" for i in range(len(chunks))]
@@ -71,9 +319,64 @@ class VectorStore:
             metadatas=metadatas
         )
 
+        with self._video_ids_lock:
+            if self._video_ids is not None:
+                self._video_ids.add(video_id)
+
         print(
             f"Added {len(chunks)} chunks from video {video_id} to vector store")
 
+    def add_transcripts_batch(self, transcripts: List[tuple], chunk_size: int = 1000, chunk_overlap: int = 100, batch_size: int = 64):
+        """
+        Add multiple transcripts in one pass, embedding all chunks together.
+
+        Batching the chunks from every video into a single encode() call
+        amortizes the embedding model's forward pass across the whole batch,
+        and one collection.add replaces one insert per video.
+
+        Args:
+            transcripts: List of (video_id, transcript_text) pairs
+            chunk_size: Number of characters per chunk
+            chunk_overlap: Number of characters to overlap between chunks
+            batch_size: Embedding batch size passed to the model
+        """
+        all_chunks = []
+        all_ids = []
+        all_metadatas = []
+
+        for video_id, transcript_text in transcripts:
+            chunks = self._chunk_text(
+                transcript_text, chunk_size, chunk_overlap)
+            for i, chunk in enumerate(chunks):
+                all_chunks.append(chunk)
+                all_ids.append(f"{video_id}_chunk_{i}")
+                all_metadatas.append({
+                    "video_id": video_id,
+                    "chunk_index": i,
+                    "text": chunk
+                })
+
+        if not all_chunks:
+            return
+
+        # One length-bucketed forward pass for every chunk of every video
+        embeddings = self._encode_chunks(all_chunks, batch_size)
+
+        self.collection.add(
+            ids=all_ids,
+            embeddings=embeddings,
+            documents=all_chunks,
+            metadatas=all_metadatas
+        )
+
+        with self._video_ids_lock:
+            if self._video_ids is not None:
+                self._video_ids.update(
+                    video_id for video_id, _ in transcripts)
+
+        print(
+            f"Added {len(all_chunks)} chunks from {len(transcripts)} videos to vector store")
+
     def _chunk_text(self, text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
         """
         Split text into overlapping chunks.
@@ -86,50 +389,126 @@ class VectorStore:
         Returns:
             List of text chunks
         """
-        chunks = []
-        start = 0
+        # Split on natural boundaries (paragraphs, sentences, words) instead
+        # of raw character windows, so chunks don't cut mid-word and stay
+        # closer to the embedding model's token window
+        if RecursiveCharacterTextSplitter is None:
+            return self._chunk_text_chars(text, chunk_size, chunk_overlap)
+
+        key = (chunk_size, chunk_overlap)
+        splitter = self._splitters.get(key)
+        if splitter is None:
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                separators=["\n\n", "\n", ". ", " ", ""]
+            )
+            self._splitters[key] = splitter
+
+        return splitter.split_text(text)
+
+    def _chunk_text_chars(self, text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+        """
+        Character-window fallback chunker (used without langchain installed).
+
+        Window positions are computed up front and whitespace is trimmed by
+        walking the boundary indices inward, so each chunk costs exactly one
+        slice allocation instead of the slice-then-strip double copy.
 
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk.strip())
-            start = end - chunk_overlap
+        Args:
+            text: Text to chunk
+            chunk_size: Size of each chunk
+            chunk_overlap: Overlap between chunks
+
+        Returns:
+            List of text chunks
+        """
+        step = chunk_size - chunk_overlap
+        n = len(text)
+        chunks = []
+        append = chunks.append
+
+        for start in range(0, n, step):
+            end = min(start + chunk_size, n)
+            # Trim boundary whitespace in place of .strip(): transcripts are
+            # space-separated words, so this walks at most a step or two
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            while start < end and text[start].isspace():
+                start += 1
+            append(text[start:end])
 
         return chunks
 
-    def search(self, query: str, n_results: int = 5) -> List[Dict]:
+    def search(self, query: str, n_results: int = 5, ef_search: Optional[int] = None) -> List[Dict]:
         """
         Search for similar transcript chunks.
 
         Args:
             query: Search query
             n_results: Number of results to return
+            ef_search: Optional HNSW ef_search override; higher values trade
+                latency for recall. Persists on the collection once set.
 
         Returns:
             List of dictionaries with 'text', 'video_id', 'chunk_index', and 'distance'
         """
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query]).tolist()[0]
-
-        # Search in collection
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results
-        )
-
-        # Format results
+        if ef_search is not None:
+            # modify(configuration=...) is the only form that updates the
+            # effective HNSW setting; modify(metadata=...) leaves the index
+            # untouched and replaces the whole metadata dict.
+            self.collection.modify(
+                configuration={"hnsw": {"ef_search": ef_search}})
+
+        # All searches funnel through the batcher: concurrent callers share
+        # one encode and one Chroma query
+        with self._query_batcher_lock:
+            if self._query_batcher is None:
+                self._query_batcher = _QueryBatcher(self)
+        return self._query_batcher.submit(query, n_results)
+
+    def _format_results(self, results: Dict, row: int, limit: int) -> List[Dict]:
+        """Format one query's rows from a (possibly multi-query) result set."""
         formatted_results = []
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
+        if results['ids'] and len(results['ids'][row]) > 0:
+            for i in range(min(limit, len(results['ids'][row]))):
                 formatted_results.append({
-                    'text': results['documents'][0][i],
-                    'video_id': results['metadatas'][0][i]['video_id'],
-                    'chunk_index': results['metadatas'][0][i]['chunk_index'],
-                    'distance': results['distances'][0][i] if 'distances' in results else None
+                    'text': results['documents'][row][i],
+                    'video_id': results['metadatas'][row][i]['video_id'],
+                    'chunk_index': results['metadatas'][row][i]['chunk_index'],
+                    'distance': results['distances'][row][i] if 'distances' in results else None
                 })
 
         return formatted_results
 
+    def export_int8_embeddings(self, path: str):
+        """
+        Export every stored embedding as an int8 matrix with per-vector scales.
+
+        Chroma keeps its index in float32 internally, so this writes a
+        quantized sidecar (.npz with 'ids', 'embeddings', 'scales') that
+        memory-bound batch consumers can scan at a quarter of the fp32
+        footprint, reranking with dequantize_embeddings_int8 if needed.
+
+        Args:
+            path: Destination .npz file
+        """
+        all_data = self.collection.get(include=["embeddings"])
+        embeddings = np.asarray(all_data['embeddings'], dtype=np.float32)
+        if embeddings.size == 0:
+            # An empty collection comes back as a 1-D empty array, which the
+            # per-vector quantization axis would choke on
+            print(f"No embeddings to export; skipping {path}")
+            return
+        quantized, scales = quantize_embeddings_int8(embeddings)
+        np.savez(path,
+                 ids=np.asarray(all_data['ids']),
+                 embeddings=quantized,
+                 scales=scales)
+        print(
+            f"Exported {len(quantized)} int8 embeddings to {path} "
+            f"({quantized.nbytes + scales.nbytes} bytes vs {embeddings.nbytes} fp32)")
+
     def get_all_videos(self) -> List[str]:
         """
         Get list of all video IDs in the store.
@@ -137,12 +516,27 @@ class VectorStore:
         Returns:
             List of unique video IDs
         """
-        all_data = self.collection.get()
-        video_ids = set()
-        if all_data['metadatas']:
-            for metadata in all_data['metadatas']:
-                video_ids.add(metadata['video_id'])
-        return list(video_ids)
+        return list(self._known_video_ids())
+
+    def get_all_video_entries(self) -> List[Dict]:
+        """
+        Get display-ready entries (id, url, thumbnail) for every video.
+
+        The URL strings are formatted once per video and cached, so list
+        renders reuse the same dicts instead of rebuilding them per request.
+
+        Returns:
+            List of dictionaries with 'id', 'url', and 'thumbnail'
+        """
+        entries = self._video_entries
+        for video_id in self._known_video_ids():
+            if video_id not in entries:
+                entries[video_id] = {
+                    'id': video_id,
+                    'url': f'https://www.youtube.com/watch?v={video_id}',
+                    'thumbnail': f'https://img.youtube.com/vi/{video_id}/mqdefault.jpg'
+                }
+        return list(entries.values())
 
     def get_transcript(self, video_id: str) -> Optional[str]:
         """
@@ -154,24 +548,24 @@ class VectorStore:
         Returns:
             Full transcript text, or None if video not found
         """
-        all_data = self.collection.get()
-        video_chunks = []
-
-        if all_data['metadatas']:
-            for i, metadata in enumerate(all_data['metadatas']):
-                if metadata['video_id'] == video_id:
-                    video_chunks.append({
-                        'text': all_data['documents'][i],
-                        'chunk_index': metadata['chunk_index']
-                    })
+        # Let Chroma's metadata index do the filtering instead of pulling
+        # every chunk of every video into Python
+        video_data = self.collection.get(
+            where={"video_id": video_id},
+            include=["documents", "metadatas"]
+        )
 
-        if not video_chunks:
+        if not video_data['documents']:
             return None
 
-        # Sort by chunk index to maintain order
-        video_chunks.sort(key=lambda x: x['chunk_index'])
+        # Sort (chunk_index, document) pairs on the index tuple element --
+        # indices are unique so no key function is needed -- and feed the
+        # join a generator rather than materializing another list
+        ordered = sorted(zip(
+            (metadata['chunk_index'] for metadata in video_data['metadatas']),
+            video_data['documents']
+        ))
 
-        # Combine all chunks
-        full_text = " ".join([chunk['text'] for chunk in video_chunks])
+        full_text = " ".join(document for _, document in ordered)
 
         return full_text
@@ -2,24 +2,82 @@
 Web UI for YouTube Transcript Viewer
 Provides a web interface to list videos and view transcripts
 """
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash
+from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, session
+from flask_caching import Cache
 from goodanalysis.vector_store import VectorStore
 from goodanalysis.transcript_downloader import download_transcript, format_transcript, get_video_id_from_url
+import functools
+import logging
 import os
-import io
 import sys
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stdout, redirect_stderr
 
+class _NullWriter:
+    """Discarding sink for suppressed library output; unlike StringIO it
+    never buffers what gets thrown away."""
+
+    def write(self, _):
+        pass
+
+    def flush(self):
+        pass
+
+
+_DEVNULL = _NullWriter()
+
+
 # Get the directory where this file is located
 template_dir = os.path.join(os.path.dirname(
     os.path.abspath(__file__)), 'templates')
 app = Flask(__name__, template_folder=template_dir)
 app.secret_key = os.urandom(24)  # For flash messages
 
+# Short-TTL view cache: repeat renders of the video list skip the store
+# lookup and template render; entries are dropped when a video is indexed
+cache = Cache(app, config={
+    "CACHE_TYPE": "SimpleCache",
+    "CACHE_DEFAULT_TIMEOUT": 30
+})
+
 # Cache the vector store instance to avoid reloading the embedding model
 _vector_store_instance = None
 
+# Background ingestion: downloaded transcripts are embedded off the request
+# thread so the POST returns as soon as the download finishes, instead of
+# blocking on the encode + Chroma insert.
+_ingest_executor = ThreadPoolExecutor(max_workers=2)
+_pending_videos = set()
+_pending_videos_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1024)
+def _video_id_for_url(url):
+    """Extract the video ID, memoized since users often resubmit the same URL.
+
+    The regex behind get_video_id_from_url is already compiled at import
+    time; this just serves repeats in O(1).
+    """
+    return get_video_id_from_url(url)
+
+
+def _ingest_transcript(video_id, transcript_text):
+    """Embed and store a downloaded transcript (runs on the ingest executor)."""
+    try:
+        with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
+            get_vector_store().add_transcript(video_id, transcript_text)
+        app.logger.info(f"Stored transcript for video {video_id}")
+        # Drop cached list views so the new video shows up immediately
+        cache.delete('view//')
+        cache.delete('view//api/videos')
+    except Exception:
+        app.logger.exception(f"Failed to store transcript for video {video_id}")
+    finally:
+        with _pending_videos_lock:
+            _pending_videos.discard(video_id)
+
 
 def get_vector_store():
     """Get initialized vector store instance (cached)."""
@@ -27,7 +85,7 @@ def get_vector_store():
     if _vector_store_instance is None:
         try:
             # Suppress print statements during initialization for web UI
-            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
                 _vector_store_instance = VectorStore()
             print("VectorStore initialized successfully", file=sys.stderr)
         except Exception as e:
@@ -47,133 +105,37 @@ def health():
 
 
 @app.route('/', methods=['GET', 'POST'])
+# Cache GET renders only; POSTs and pages with pending flash messages must
+# go through the handler so messages are consumed, not cached or dropped
+@cache.cached(unless=lambda: request.method != 'GET' or bool(session.get('_flashes')))
 def index():
     """Home page - list all videos and handle video URL submission."""
     if request.method == 'POST':
-        # Force output to stderr (unbuffered) and stdout
-
-        def log_debug(msg):
-            sys.stderr.write(str(msg) + "\n")
-            sys.stderr.flush()
-            print(msg, flush=True)
-            app.logger.info(str(msg))
-
-        # Comprehensive logging for debugging - use stderr (unbuffered)
-        log_debug("\n" + "="*60)
-        log_debug("🔍 POST REQUEST DEBUG INFO")
-        log_debug("="*60)
-        log_debug(f"Method: {request.method}")
-        log_debug(f"URL: {request.url}")
-        log_debug(f"Content-Type: {request.content_type}")
-        log_debug(f"Content-Length: {request.content_length}")
-
-        # Log form data in detail
-        form_dict = dict(request.form)
-        log_debug(f"\n📋 Form data (ImmutableMultiDict): {form_dict}")
-        log_debug(f"Form keys: {list(request.form.keys())}")
-        for key in request.form.keys():
-            value = request.form.get(key)
-            log_debug(
-                f"  • '{key}' = '{value}' (type: {type(value).__name__}, len: {len(str(value))})")
-
-        # Log JSON if present
-        json_data = request.get_json(silent=True)
-        log_debug(f"\n📦 JSON data: {json_data}")
-        log_debug(f"Is JSON: {request.is_json}")
-
-        # Log raw request data
-        raw_data = request.get_data(as_text=True)
-        log_debug(f"\n📄 Raw request data (first 500 chars):")
-        log_debug(raw_data[:500] if raw_data else "None")
-        log_debug(f"Raw data length: {len(raw_data) if raw_data else 0}")
-
-        # Try to manually parse form data if Flask didn't parse it
-        if not form_dict and raw_data:
-            log_debug(
-                "\n⚠️  Flask didn't parse form data, trying manual parse...")
-            try:
-                from urllib.parse import unquote_plus, parse_qs
-                parsed_data = parse_qs(raw_data)
-                log_debug(f"Manually parsed data: {parsed_data}")
-                if 'video_url' in parsed_data:
-                    video_url_manual = parsed_data['video_url'][0] if parsed_data['video_url'] else ''
-                    log_debug(
-                        f"Found video_url in manual parse: '{video_url_manual}'")
-            except Exception as parse_error:
-                log_debug(f"Manual parse error: {parse_error}")
-                import traceback
-                log_debug(traceback.format_exc())
-
-        # Try multiple methods to get video_url
-        video_url = None
-        source = None
-
-        # Method 1: Form data
-        if 'video_url' in request.form:
-            video_url = request.form.get('video_url', '').strip()
-            source = "form"
-            log_debug(f"\n✅ Found video_url in FORM: '{video_url}'")
-
-        # Method 2: Manual parse from raw data (if Flask didn't parse it)
-        if not video_url and raw_data:
-            try:
-                from urllib.parse import unquote_plus, parse_qs
-                parsed_data = parse_qs(raw_data)
-                log_debug(f"Manual parse result: {parsed_data}")
-                if 'video_url' in parsed_data and parsed_data['video_url']:
-                    video_url = parsed_data['video_url'][0].strip()
-                    source = "manual_parse"
-                    log_debug(
-                        f"\n✅ Found video_url in MANUAL PARSE: '{video_url}'")
-            except Exception as parse_error:
-                log_debug(f"Manual parse error: {parse_error}")
-                import traceback
-                log_debug(traceback.format_exc())
-
-        # Method 3: JSON
-        if not video_url and request.is_json:
-            json_data = request.get_json(silent=True) or {}
-            video_url = json_data.get('video_url', '').strip()
-            source = "json"
-            log_debug(f"\n✅ Found video_url in JSON: '{video_url}'")
-
-        # Method 4: Query args (just in case)
-        if not video_url and 'video_url' in request.args:
-            video_url = request.args.get('video_url', '').strip()
-            source = "args"
-            log_debug(f"\n✅ Found video_url in ARGS: '{video_url}'")
-
-        # Final result
-        if not video_url:
-            video_url = ''
-            log_debug(f"\n❌ NO video_url found in any source!")
-            log_debug(f"   Available form keys: {list(request.form.keys())}")
-            log_debug(f"   Available args keys: {list(request.args.keys())}")
-            log_debug(f"   Raw data: {raw_data[:200] if raw_data else 'None'}")
-        else:
-            log_debug(
-                f"\n✓ Final video_url from {source}: '{video_url}' (length: {len(video_url)})")
-
-        log_debug("="*60 + "\n")
+        # video_url normally arrives as form data; accept JSON and query
+        # args as well for API-style callers
+        video_url = (request.form.get('video_url')
+                     or (request.get_json(silent=True) or {}).get('video_url')
+                     or request.args.get('video_url')
+                     or '').strip()
+
+        # Debug-level so the formatting (and the request-body read) is
+        # skipped entirely in normal operation
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug(
+                f"POST / content_type={request.content_type} "
+                f"form_keys={list(request.form.keys())} "
+                f"video_url={video_url!r}")
 
         if not video_url:
-            error_details = (
-                f"Form keys: {list(request.form.keys())}, "
-                f"Args keys: {list(request.args.keys())}, "
-                f"Content-Type: {request.content_type}, "
-                f"Raw data length: {len(raw_data) if raw_data else 0}, "
-                f"Raw data preview: {raw_data[:100] if raw_data else 'None'}"
-            )
-            error_msg = f'Please enter a YouTube video URL or video ID. Debug: {error_details}'
-            log_debug(f"ERROR: Empty video_url - {error_details}")
-            flash(error_msg, 'error')
+            flash('Please enter a YouTube video URL or video ID.', 'error')
             return redirect(url_for('index'))
 
+        video_id = None
         try:
             app.logger.info(f"Processing video URL: {video_url}")
 
             # Extract video ID
-            video_id = get_video_id_from_url(video_url)
+            video_id = _video_id_for_url(video_url)
             app.logger.info(f"Extracted video ID: {video_id}")
 
             # Check if video already exists
@@ -190,12 +152,21 @@ def index():
                     f'Video {video_id} is already in the database. Redirecting to transcript...', 'info')
                 return redirect(url_for('view_transcript', video_id=video_id))
 
+            with _pending_videos_lock:
+                if video_id in _pending_videos:
+                    flash(
+                        f'Video {video_id} is already being processed. It will appear in the list shortly.', 'info')
+                    return redirect(url_for('index'))
+                _pending_videos.add(video_id)
+
             # Download transcript (suppress print statements)
             app.logger.info(f"Downloading transcript for video {video_id}...")
-            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
                 transcript = download_transcript(video_id)
 
             if not transcript:
+                with _pending_videos_lock:
+                    _pending_videos.discard(video_id)
                 app.logger.error(
                     f"Failed to download transcript for video {video_id}")
                 flash(
@@ -210,18 +181,21 @@ def index():
             app.logger.info(
                 f"Formatted transcript ({len(transcript_text)} characters)")
 
-            # Add to vector store (suppress print statements)
-            app.logger.info(f"Storing transcript in vector database...")
-            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-                vector_store.add_transcript(video_id, transcript_text)
+            # Hand the embed + store off to the background worker so the
+            # request returns now; the next download can overlap with this
+            # transcript's encode
+            _ingest_executor.submit(
+                _ingest_transcript, video_id, transcript_text)
 
             app.logger.info(
-                f"Successfully stored transcript for video {video_id}")
+                f"Queued transcript for video {video_id} for indexing")
             flash(
-                f'Successfully downloaded and stored transcript for video {video_id}!', 'success')
-            return redirect(url_for('view_transcript', video_id=video_id))
+                f'Downloaded transcript for video {video_id}! It is being indexed and will appear in the list shortly.', 'success')
+            return redirect(url_for('index'))
 
         except Exception as e:
+            with _pending_videos_lock:
+                _pending_videos.discard(video_id)
             # Log the full error for debugging
             error_details = traceback.format_exc()
             app.logger.error(
@@ -230,19 +204,10 @@ def index():
                 f'Error processing video: {str(e)}. Check server logs for details.', 'error')
             return redirect(url_for('index'))
 
-    # GET request - show video list
+    # GET request - show video list (entries are pre-formatted by the store)
     try:
         vector_store = get_vector_store()
-        videos = vector_store.get_all_videos()
-
-        # Create video data with YouTube URLs
-        video_data = []
-        for video_id in videos:
-            video_data.append({
-                'id': video_id,
-                'url': f'https://www.youtube.com/watch?v={video_id}',
-                'thumbnail': f'https://img.youtube.com/vi/{video_id}/mqdefault.jpg'
-            })
+        video_data = vector_store.get_all_video_entries()
 
         return render_template('index.html', videos=video_data)
     except Exception as e:
@@ -279,20 +244,11 @@ def view_transcript(video_id):
 
 
 @app.route('/api/videos')
+@cache.cached()
 def api_videos():
     """API endpoint to get list of videos."""
     vector_store = get_vector_store()
-    videos = vector_store.get_all_videos()
-
-    video_data = []
-    for video_id in videos:
-        video_data.append({
-            'id': video_id,
-            'url': f'https://www.youtube.com/watch?v={video_id}',
-            'thumbnail': f'https://img.youtube.com/vi/{video_id}/mqdefault.jpg'
-        })
-
-    return jsonify(video_data)
+    return jsonify(vector_store.get_all_video_entries())
 
 
 @app.route('/api/video/<video_id>/transcript')
@@ -329,7 +285,9 @@ def run_web_ui(host='127.0.0.1', port=5000, debug=False):
             f"Template directory not found: {template_dir}")
 
     print(f"Template directory: {template_dir}", file=sys.stderr)
-    print(f"Templates found: {os.listdir(template_dir)}", file=sys.stderr)
+    if debug:
+        print(
+            f"Templates found: {os.listdir(template_dir)}", file=sys.stderr)
 
     print(f"\n🌐 Starting web UI server...")
     print(f"📱 Open your browser to: http://{host}:{port}")